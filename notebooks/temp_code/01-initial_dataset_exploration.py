@@ -10,60 +10,34 @@ Based on the SQL file, this appears to be a renewal investigation dataset
 focusing on subscription renewals, expirations, and customer segments.
 """
 
+import asyncio
 import sys
 from pathlib import Path
 import pandas as pd
 import numpy as np
 
-# Add utils to path for importing - use absolute path to avoid issues
-import os
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-utils_path = os.path.join(project_root, 'utils')
-sys.path.insert(0, utils_path)
+# Make the repo root importable when the project isn't installed (pip install -e .)
+project_root = Path(__file__).resolve().parents[2]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
-from databricks_query import DatabricksQueryClient, query_databricks
+from utils.databricks_query import DatabricksQueryClient, query_databricks
 
-def main():
-    """Explore the dataset structure and basic statistics."""
-    
-    print("🔍 Dataset Initial Exploration")
-    print("=" * 50)
-    
-    # Initialize client
-    try:
-        client = DatabricksQueryClient(debug=True)
-        print("✅ Connected to Databricks")
-    except Exception as e:
-        print(f"❌ Failed to connect to Databricks: {e}")
-        return
-    
-    # First, let's check if the table exists and get basic info
-    table_name = "users.kartikey_chauhan.nar_renewal_investigation_2025_q3_mpd_ret_devices_ngm_v7"
-    
-    print(f"\n📊 Exploring table: {table_name}")
-    print("-" * 70)
-    
-    # 1. Check table structure by getting first row and examining columns
-    print("\n1️⃣ Getting table schema by examining first row...")
-    first_row_query = f"""
-    SELECT *
-    FROM {table_name}
-    LIMIT 1
-    """
-    
-    try:
-        first_row = client.execute_query(first_row_query, "First Row for Schema")
-        print(f"✅ Table has {len(first_row.columns)} columns")
-        print("\nColumn Names:")
-        for i, col in enumerate(first_row.columns, 1):
-            print(f"  {i:2d}. {col}")
-    except Exception as e:
-        print(f"❌ Error getting schema: {e}")
-        return
+async def cancel(*tasks):
+    """Cancel pending query tasks (and their statements on the warehouse)."""
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+async def explore(client, table_name):
+    """Run the exploration queries; returns False if a step failed."""
     
-    # 2. Get basic row count and date ranges
-    print("\n2️⃣ Getting basic statistics...")
-    basic_stats_query = f"""
+    # The aggregate queries are independent, so submit them together and
+    # let the warehouse run them while the schema is read from the catalog
+    queries = {
+        # 2 + 4. Basic row counts, date ranges and key dimension cardinalities
+        # computed in a single pass over the table
+        "Table Overview": f"""
     SELECT 
         COUNT(*) as total_rows,
         COUNT(DISTINCT 9M_expiry_transaction_id) as unique_expiry_transactions,
@@ -71,76 +45,121 @@ def main():
         MIN(9M_subscription_expiry_datetime) as earliest_expiry,
         MAX(9M_subscription_expiry_datetime) as latest_expiry,
         MIN(expiration_week) as earliest_expiration_week,
-        MAX(expiration_week) as latest_expiration_week
+        MAX(expiration_week) as latest_expiration_week,
+        COUNT(DISTINCT customer_type) as unique_customer_types,
+        COUNT(DISTINCT subscription_renewed_geo) as unique_geos,
+        COUNT(DISTINCT subscription_renewed_country) as unique_countries,
+        COUNT(DISTINCT subscription_renewed_channel) as unique_channels,
+        COUNT(DISTINCT renewal_transition_type) as unique_transition_types,
+        COUNT(DISTINCT 9M_subscription_expiry_package_name) as unique_expiry_packages,
+        COUNT(DISTINCT subscription_renewed_package_name) as unique_renewal_packages
     FROM {table_name}
-    """
+    """,
+        # 5. Customer type breakdown - only customer_type is scanned; the
+        # percentage is computed locally instead of with a window pass
+        "Customer Types": f"""
+    SELECT 
+        customer_type,
+        COUNT(*) as count
+    FROM {table_name}
+    GROUP BY customer_type
+    ORDER BY count DESC
+    """,
+    }
+    batch = asyncio.ensure_future(client.execute_many(queries, return_exceptions=True))
     
+    # 1. Read table structure from information_schema (no data scan)
+    print("\n1️⃣ Getting table schema from the catalog...")
     try:
-        basic_stats = client.execute_query(basic_stats_query, "Basic Statistics")
-        print("\nDataset Overview:")
-        for col in basic_stats.columns:
-            print(f"  {col}: {basic_stats[col].iloc[0]}")
+        schema = await asyncio.to_thread(client.get_table_columns, table_name)
     except Exception as e:
-        print(f"❌ Error getting basic stats: {e}")
-        return
+        print(f"❌ Error getting schema: {e}")
+        await cancel(batch)
+        return False
+    # information_schema has no rows for missing or inaccessible tables
+    if schema.empty:
+        print(f"❌ Table not found or not accessible: {table_name}")
+        await cancel(batch)
+        return False
+    print(f"✅ Table has {len(schema)} columns")
+    print("\nColumn Names:")
+    for i, col in enumerate(schema["column_name"], 1):
+        print(f"  {i:2d}. {col}")
     
-    # 3. Sample data preview
-    print("\n3️⃣ Sample data preview...")
+    # 3. Sample data preview - project only the columns we display so the
+    # scan reads 10 column chunks instead of the whole table width
+    preview_columns = ", ".join(f"`{col}`" for col in schema["column_name"][:10])
     sample_query = f"""
-    SELECT *
+    SELECT {preview_columns}
     FROM {table_name}
     LIMIT 5
     """
+    sample = asyncio.ensure_future(client.execute_query_async(sample_query, "Sample Data"))
+    
+    results = await batch
     
+    # Report results in the original order
+    print("\n2️⃣ Getting basic statistics...")
+    overview = results["Table Overview"]
+    if isinstance(overview, Exception):
+        print(f"❌ Error getting basic stats: {overview}")
+        await cancel(sample)
+        return False
+    # First 7 columns are the basic statistics, the rest are
+    # dimension cardinalities
+    basic_stats = overview.iloc[:, :7]
+    dimensions = overview.iloc[:, 7:]
+    print("\nDataset Overview:")
+    for col, val in basic_stats.iloc[0].items():
+        print(f"  {col}: {val}")
+    
+    print("\n3️⃣ Sample data preview...")
     try:
-        sample_data = client.execute_query(sample_query, "Sample Data")
-        print(f"\nSample rows (showing first 10 columns):")
-        print(sample_data.iloc[:, :10].to_string(index=False))
+        sample_data = await sample
     except Exception as e:
         print(f"❌ Error getting sample data: {e}")
-        return
+        return False
+    print(f"\nSample rows (showing first 10 columns):")
+    print(sample_data.to_string(index=False))
     
-    # 4. Check key dimensions
     print("\n4️⃣ Exploring key dimensions...")
-    dimensions_query = f"""
-    SELECT 
-        COUNT(DISTINCT customer_type) as unique_customer_types,
-        COUNT(DISTINCT subscription_renewed_geo) as unique_geos,
-        COUNT(DISTINCT subscription_renewed_country) as unique_countries,
-        COUNT(DISTINCT subscription_renewed_channel) as unique_channels,
-        COUNT(DISTINCT renewal_transition_type) as unique_transition_types,
-        COUNT(DISTINCT 9M_subscription_expiry_package_name) as unique_expiry_packages,
-        COUNT(DISTINCT subscription_renewed_package_name) as unique_renewal_packages
-    FROM {table_name}
-    """
+    print("\nDimensional Cardinality:")
+    for col, val in dimensions.iloc[0].items():
+        print(f"  {col}: {val}")
+    
+    print("\n5️⃣ Customer type distribution...")
+    customer_types = results["Customer Types"]
+    if isinstance(customer_types, Exception):
+        print(f"❌ Error getting customer types: {customer_types}")
+        return False
+    customer_types["percentage"] = (
+        customer_types["count"] * 100.0 / customer_types["count"].sum()
+    ).round(2)
+    print("\nCustomer Type Distribution:")
+    print(customer_types.to_string(index=False))
+    return True
+
+def main():
+    """Explore the dataset structure and basic statistics."""
+    
+    print("🔍 Dataset Initial Exploration")
+    print("=" * 50)
     
+    # Initialize client
     try:
-        dimensions = client.execute_query(dimensions_query, "Key Dimensions")
-        print("\nDimensional Cardinality:")
-        for col in dimensions.columns:
-            print(f"  {col}: {dimensions[col].iloc[0]}")
+        client = DatabricksQueryClient(debug=True, cache="enabled", disposition="INLINE")
+        print("✅ Connected to Databricks")
     except Exception as e:
-        print(f"❌ Error getting dimensions: {e}")
+        print(f"❌ Failed to connect to Databricks: {e}")
         return
     
-    # 5. Customer type breakdown
-    print("\n5️⃣ Customer type distribution...")
-    customer_type_query = f"""
-    SELECT 
-        customer_type,
-        COUNT(*) as count,
-        ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER(), 2) as percentage
-    FROM {table_name}
-    GROUP BY customer_type
-    ORDER BY count DESC
-    """
+    # First, let's check if the table exists and get basic info
+    table_name = "users.kartikey_chauhan.nar_renewal_investigation_2025_q3_mpd_ret_devices_ngm_v7"
     
-    try:
-        customer_types = client.execute_query(customer_type_query, "Customer Types")
-        print("\nCustomer Type Distribution:")
-        print(customer_types.to_string(index=False))
-    except Exception as e:
-        print(f"❌ Error getting customer types: {e}")
+    print(f"\n📊 Exploring table: {table_name}")
+    print("-" * 70)
+    
+    if not asyncio.run(explore(client, table_name)):
         return
     
     print("\n✅ Initial exploration completed!")
@@ -0,0 +1,66 @@
+"""Shared fixtures: a throwaway .env and a mocked Statement Execution API."""
+
+import os
+
+import httpx
+import pytest
+
+from utils.databricks_query import DatabricksQueryClient
+
+ENV_VARS = (
+    "DATABRICKS_ACCESS_TOKEN",
+    "DATABRICKS_SERVER_HOSTNAME",
+    "DATABRICKS_HTTP_PATH",
+)
+
+
+@pytest.fixture
+def write_env(tmp_path, monkeypatch):
+    """Return a function writing tmp_path/.env with a given token and mtime."""
+    monkeypatch.chdir(tmp_path)
+    # load_dotenv writes os.environ; let monkeypatch restore it afterwards
+    for name in ENV_VARS:
+        monkeypatch.delenv(name, raising=False)
+    DatabricksQueryClient.clear_cache()
+
+    def write(token="test-token", mtime=None):
+        path = tmp_path / ".env"
+        path.write_text(
+            f"DATABRICKS_ACCESS_TOKEN={token}\n"
+            "DATABRICKS_SERVER_HOSTNAME=example.cloud.databricks.com\n"
+            "DATABRICKS_HTTP_PATH=/sql/1.0/warehouses/abc123\n"
+        )
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    yield write
+    DatabricksQueryClient.clear_cache()
+
+
+@pytest.fixture
+def succeeded():
+    """A finished statement returning one row with INT column x = 1 as JSON."""
+    return {
+        "statement_id": "ok",
+        "status": {"state": "SUCCEEDED"},
+        "manifest": {
+            "format": "JSON_ARRAY",
+            "schema": {"columns": [{"name": "x", "type_name": "INT"}]},
+        },
+        "result": {"data_array": [["1"]]},
+    }
+
+
+@pytest.fixture
+def use_warehouse(monkeypatch):
+    """Return a function routing a client's async API calls to a mock handler."""
+
+    def use(client, handler):
+        monkeypatch.setattr(
+            client,
+            "_async_client",
+            lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+
+    return use
@@ -0,0 +1,46 @@
+"""_canonicalize normalizes layout without changing what a query means."""
+
+import pytest
+
+from utils.databricks_query import QUERY_TAG, _canonicalize
+
+
+def test_strips_indentation_and_blank_lines():
+    query = """
+        SELECT a,   b
+          FROM t  -- trailing comment
+
+        WHERE a > 1
+    """
+    assert _canonicalize(query) == (
+        f"{QUERY_TAG}\nSELECT a,   b\nFROM t  -- trailing comment\nWHERE a > 1"
+    )
+
+
+def test_reindented_query_canonicalizes_the_same():
+    assert _canonicalize("SELECT 1\n    FROM t") == _canonicalize(
+        "  SELECT 1\nFROM t\n"
+    )
+
+
+@pytest.mark.parametrize(
+    "literal",
+    [
+        "'line one\n    indented line two'",
+        '"line one\n\n  line three"',
+        "'it\\'s\n  escaped'",
+        "`odd\n  name`",
+    ],
+)
+def test_keeps_multiline_literals(literal):
+    query = f"  SELECT *\n  FROM t\n  WHERE note = {literal}\n  LIMIT 1"
+    assert _canonicalize(query) == (
+        f"{QUERY_TAG}\nSELECT *\nFROM t\nWHERE note = {literal}\nLIMIT 1"
+    )
+
+
+def test_quotes_in_comments_do_not_open_literals():
+    query = "SELECT 1 -- don't\n    FROM t /* it's */\n    WHERE x = 'a\n  b'"
+    assert _canonicalize(query) == (
+        f"{QUERY_TAG}\nSELECT 1 -- don't\nFROM t /* it's */\nWHERE x = 'a\n  b'"
+    )
@@ -0,0 +1,60 @@
+"""Cloud Fetch downloads send the link's headers but never the API token."""
+
+import asyncio
+
+import httpx
+import pytest
+import requests
+
+from utils import databricks_query
+from utils.databricks_query import DatabricksQueryClient
+
+CHUNK = {
+    "external_links": [
+        {
+            "external_link": "https://storage.example.com/chunk",
+            "http_headers": {"x-amz-server-side-encryption-customer-key": "secret"},
+        }
+    ]
+}
+
+
+@pytest.fixture
+def client(write_env, monkeypatch):
+    monkeypatch.setattr(databricks_query, "_chunk_to_table", lambda *args: None)
+    return DatabricksQueryClient(env_path=write_env())
+
+
+def assert_download_headers(headers):
+    assert headers["x-amz-server-side-encryption-customer-key"] == "secret"
+    assert "Authorization" not in headers
+
+
+def test_sync_download_sends_link_headers(client, monkeypatch):
+    sent = []
+
+    def send(adapter, request, **kwargs):
+        sent.append(request.headers)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b""
+        return response
+
+    monkeypatch.setattr(databricks_query._TLSAdapter, "send", send)
+    client._fetch_chunk("abc", 0, CHUNK, [])
+    assert_download_headers(sent[0])
+
+
+def test_async_download_sends_link_headers(client):
+    sent = []
+
+    def storage(request):
+        sent.append(request.headers)
+        return httpx.Response(200, content=b"")
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(storage)) as http:
+            await client._fetch_chunk_async(http, "abc", 0, CHUNK, [])
+
+    asyncio.run(run())
+    assert_download_headers(sent[0])
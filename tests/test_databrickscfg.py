@@ -0,0 +1,33 @@
+"""The .databrickscfg reader matches profiles the way ConfigParser does."""
+
+import pytest
+
+from utils.token_auth_setup import _find_cfg_token
+
+HOST = "https://adb-123.azuredatabricks.net"
+
+
+def find(path, host=HOST):
+    stat = path.stat()
+    return _find_cfg_token(str(path), stat.st_mtime_ns, stat.st_size, host)
+
+
+@pytest.mark.parametrize(
+    "profile",
+    [
+        f"host = {HOST}\ntoken = dapi-1\n",
+        f"token=dapi-1\nhost={HOST}/\n",
+        f"Host = {HOST}\nTOKEN = dapi-1\n",
+        f"host: {HOST}\ntoken: dapi-1\n",
+    ],
+)
+def test_finds_matching_profile(tmp_path, profile):
+    cfg = tmp_path / ".databrickscfg"
+    cfg.write_text(f"[other]\nhost = https://elsewhere\ntoken = x\n\n[dev]\n{profile}")
+    assert find(cfg) == ("dev", "dapi-1")
+
+
+def test_no_match_for_other_host(tmp_path):
+    cfg = tmp_path / ".databrickscfg"
+    cfg.write_text("[dev]\nhost = https://elsewhere\ntoken = dapi-1\n")
+    assert find(cfg) is None
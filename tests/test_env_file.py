@@ -0,0 +1,47 @@
+"""update_env_file rewrites .env in place without changing how it is stored."""
+
+import stat
+import tempfile
+
+from utils.token_auth_setup import DatabricksTokenSetup
+
+
+def test_keeps_mode_and_comments(tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text("# keep me\nOTHER=1\nDATABRICKS_ACCESS_TOKEN=old\n")
+    env_file.chmod(0o644)
+
+    assert DatabricksTokenSetup(tmp_path).update_env_file("new")
+
+    content = env_file.read_text()
+    assert content.startswith("# keep me\nOTHER=1\nDATABRICKS_ACCESS_TOKEN=new\n")
+    assert stat.S_IMODE(env_file.stat().st_mode) == 0o644
+
+
+def test_keeps_symlink(tmp_path):
+    real = tmp_path / "shared.env"
+    real.write_text("DATABRICKS_ACCESS_TOKEN=old\n")
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / ".env").symlink_to(real)
+
+    assert DatabricksTokenSetup(workspace).update_env_file("new")
+
+    assert (workspace / ".env").is_symlink()
+    assert "DATABRICKS_ACCESS_TOKEN=new\n" in real.read_text()
+
+
+def test_no_temp_file_left_on_failed_write(tmp_path, monkeypatch):
+    real_temp_file = tempfile.NamedTemporaryFile
+
+    def fail(data):
+        raise OSError("disk full")
+
+    def failing_temp_file(*args, **kwargs):
+        f = real_temp_file(*args, **kwargs)
+        f.write = fail
+        return f
+
+    monkeypatch.setattr(tempfile, "NamedTemporaryFile", failing_temp_file)
+    assert not DatabricksTokenSetup(tmp_path).update_env_file("new")
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,106 @@
+"""execute_many against a mocked Statement Execution API."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from utils.databricks_query import DatabricksQueryClient
+
+
+class FakeWarehouse:
+    """Answers submissions based on the statement text; records every call."""
+
+    def __init__(self, succeeded, fail_first_submits=0):
+        self.calls = []
+        self.succeeded = succeeded
+        self.fail_first_submits = fail_first_submits
+
+    def __call__(self, request):
+        path = request.url.path.removeprefix("/api/2.0/sql/statements")
+        self.calls.append((request.method, path))
+
+        if request.method == "POST" and path == "":
+            if self.fail_first_submits:
+                self.fail_first_submits -= 1
+                return httpx.Response(503, json={"message": "busy"})
+            statement = request.read().decode()
+            if "FAIL" in statement:
+                return httpx.Response(
+                    200,
+                    json={
+                        "statement_id": "bad",
+                        "status": {"state": "FAILED", "error": {"message": "boom"}},
+                    },
+                )
+            if "SLOW" in statement:
+                return httpx.Response(
+                    200, json={"statement_id": "slow", "status": {"state": "PENDING"}}
+                )
+            return httpx.Response(200, json=self.succeeded)
+        if request.method == "GET" and path == "/slow":
+            return httpx.Response(
+                200, json={"statement_id": "slow", "status": {"state": "RUNNING"}}
+            )
+        if request.method == "POST" and path.endswith("/cancel"):
+            return httpx.Response(200, json={})
+        raise AssertionError(f"unexpected call {request.method} {path}")
+
+
+@pytest.fixture
+def client(write_env):
+    env_path = write_env()
+    client = DatabricksQueryClient(env_path=env_path)
+    client.POLL_INITIAL_DELAY = 0.01
+    client.RETRY_BACKOFF = 0
+    return client
+
+
+@pytest.fixture
+def warehouse(succeeded):
+    return FakeWarehouse(succeeded)
+
+
+def test_failure_cancels_running_siblings(client, warehouse, use_warehouse):
+    use_warehouse(client, warehouse)
+
+    async def run():
+        with pytest.raises(RuntimeError, match="boom"):
+            await client.execute_many({"slow": "SELECT 'SLOW'", "bad": "SELECT 'FAIL'"})
+
+    asyncio.run(run())
+    assert ("POST", "/slow/cancel") in warehouse.calls
+
+
+def test_return_exceptions_keeps_other_results(client, warehouse, use_warehouse):
+    use_warehouse(client, warehouse)
+
+    results = asyncio.run(
+        client.execute_many(
+            {"good": "SELECT 1 AS x", "bad": "SELECT 'FAIL'"}, return_exceptions=True
+        )
+    )
+    assert results["good"]["x"].tolist() == [1]
+    assert isinstance(results["bad"], RuntimeError)
+
+
+def test_submission_retried_on_503(client, warehouse, use_warehouse):
+    warehouse.fail_first_submits = 2
+    use_warehouse(client, warehouse)
+
+    df = asyncio.run(client.execute_query_async("SELECT 1 AS x"))
+    assert df["x"].tolist() == [1]
+    assert warehouse.calls.count(("POST", "")) == 3
+
+
+def test_async_client_reused_within_a_loop(client, warehouse, use_warehouse):
+    use_warehouse(client, warehouse)
+
+    async def run():
+        await client.execute_query_async("SELECT 1 AS x")
+        first = client._aclient
+        await client.execute_many({"again": "SELECT 1 AS x"})
+        assert client._aclient is first
+        await client.aclose()
+
+    asyncio.run(run())
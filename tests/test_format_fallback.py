@@ -0,0 +1,56 @@
+"""Only format rejections fall back from Arrow to JSON results."""
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+from utils.databricks_query import DatabricksAPIError, DatabricksQueryClient
+
+
+@pytest.fixture
+def client(write_env):
+    client = DatabricksQueryClient(env_path=write_env())
+    client.RETRY_BACKOFF = 0
+    return client
+
+
+@pytest.fixture
+def run_against(client, succeeded, use_warehouse):
+    """Return a function running a query where Arrow submissions get a 400."""
+
+    def run(rejection):
+        submitted = []
+
+        def warehouse(request):
+            payload = orjson.loads(request.read())
+            submitted.append(payload["format"])
+            if payload["format"] == "ARROW_STREAM":
+                return httpx.Response(400, json=rejection)
+            return httpx.Response(200, json=succeeded)
+
+        use_warehouse(client, warehouse)
+        return submitted, asyncio.run(client.execute_query_async("SELECT 1 AS x"))
+
+    return run
+
+
+def test_format_rejection_falls_back_to_json(run_against):
+    rejection = {
+        "error_code": "INVALID_PARAMETER_VALUE",
+        "message": "ARROW_STREAM format is not supported with INLINE disposition",
+    }
+    submitted, df = run_against(rejection)
+    assert submitted == ["ARROW_STREAM", "JSON_ARRAY"]
+    assert df["x"].tolist() == [1]
+
+
+def test_other_bad_request_is_raised(run_against):
+    rejection = {
+        "error_code": "INVALID_PARAMETER_VALUE",
+        "message": "abc is not a valid endpoint id.",
+    }
+    with pytest.raises(DatabricksAPIError, match="not a valid endpoint") as excinfo:
+        run_against(rejection)
+    assert excinfo.value.error_code == "INVALID_PARAMETER_VALUE"
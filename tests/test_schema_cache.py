@@ -0,0 +1,87 @@
+"""get_table_columns honours the client's cache policy and TTL."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from utils.databricks_query import DatabricksQueryClient
+
+TABLE = "main.sales.orders"
+
+
+@pytest.fixture
+def make_client(write_env, tmp_path, monkeypatch):
+    env_path = write_env()
+    monkeypatch.setattr(DatabricksQueryClient, "SCHEMA_CACHE_DIR", tmp_path / "schema")
+    monkeypatch.setattr(DatabricksQueryClient, "QUERY_CACHE_DIR", tmp_path / "query")
+
+    def make(columns=("id",), **kwargs):
+        client = DatabricksQueryClient(env_path=env_path, **kwargs)
+        client.queries = []
+        # Columns the warehouse currently reports; tests change it in place
+        client.columns = list(columns)
+
+        def fake_run(query, query_name="Query", timeout=300):
+            client.queries.append(query_name)
+            return {}
+
+        def fake_fetch(statement):
+            return pd.DataFrame(
+                {
+                    "column_name": client.columns,
+                    "data_type": ["bigint"] * len(client.columns),
+                }
+            )
+
+        client._run_statement = fake_run
+        client._fetch_result = fake_fetch
+        return client
+
+    return make
+
+
+def test_disabled_cache_never_touches_disk(make_client, tmp_path):
+    client = make_client()
+    client.get_table_columns(TABLE)
+    client.get_table_columns(TABLE)
+    assert len(client.queries) == 2
+    assert not (tmp_path / "schema").exists()
+
+
+def test_enabled_cache_serves_second_lookup(make_client, tmp_path):
+    client = make_client(cache="enabled")
+    client.get_table_columns(TABLE)
+    columns = client.get_table_columns(TABLE)
+    assert len(client.queries) == 1
+    assert columns["column_name"].tolist() == ["id"]
+    assert [p.name for p in (tmp_path / "schema").iterdir()] == [f"{TABLE}.parquet"]
+
+
+def test_expired_schema_is_refetched(make_client, tmp_path):
+    client = make_client(cache="enabled", cache_ttl=60)
+    client.get_table_columns(TABLE)
+    cached = tmp_path / "schema" / f"{TABLE}.parquet"
+    os.utime(cached, (0, 0))
+
+    client.get_table_columns(TABLE)
+    assert len(client.queries) == 2
+
+
+def test_missing_table_is_looked_up_again(make_client):
+    client = make_client(columns=(), cache="enabled")
+    assert client.get_table_columns(TABLE).empty
+
+    client.columns = ["id"]
+    assert client.get_table_columns(TABLE)["column_name"].tolist() == ["id"]
+    assert len(client.queries) == 2
+
+
+def test_use_cache_false_reads_current_schema(make_client):
+    client = make_client(cache="enabled")
+    client.get_table_columns(TABLE)
+
+    client.columns = ["id", "amount"]
+    columns = client.get_table_columns(TABLE, use_cache=False)
+    assert columns["column_name"].tolist() == ["id", "amount"]
+    assert len(client.queries) == 2
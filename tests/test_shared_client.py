@@ -0,0 +1,15 @@
+"""The convenience functions' shared client follows token refreshes."""
+
+from utils import databricks_query
+
+
+def test_refreshed_token_rebuilds_shared_client(write_env):
+    write_env("old-token", mtime=1_000_000)
+    client = databricks_query._get_client()
+    assert client.token == "old-token"
+    assert databricks_query._get_client() is client
+
+    write_env("new-token", mtime=2_000_000)
+    refreshed = databricks_query._get_client()
+    assert refreshed is not client
+    assert refreshed.token == "new-token"
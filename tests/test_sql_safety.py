@@ -0,0 +1,52 @@
+"""Allow/block cases for DatabricksQueryClient._check_sql_safety."""
+
+import pytest
+
+from utils.databricks_query import DatabricksQueryClient
+
+
+@pytest.fixture
+def client():
+    # The safety check needs no credentials or session
+    return DatabricksQueryClient.__new__(DatabricksQueryClient)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT 1",
+        "  select * from catalog.schema.t limit 5",
+        "WITH a AS (SELECT 1 AS x) SELECT x FROM a",
+        "SHOW TABLES IN catalog.schema",
+        "DESCRIBE catalog.schema.t",
+        "SELECT update_ts, created_at FROM t WHERE deleted = false",
+    ],
+)
+def test_allows_read_only_queries(client, query):
+    client._check_sql_safety(query)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "INSERT INTO t VALUES (1)",
+        "DROP TABLE t",
+        "SHOW GRANTS ON t",
+        "OPTIMIZE t",
+        "SELECT 1; DROP TABLE t",
+        "SELECT 1; DELETE FROM t",
+        "WITH a AS (SELECT 1) INSERT INTO t SELECT * FROM a",
+        "WITH a AS (SELECT 1) INSERT OVERWRITE TABLE t SELECT * FROM a",
+        "WITH a AS (SELECT 1) insert overwrite t SELECT * FROM a",
+        "WITH a AS (SELECT 1) MERGE INTO t USING a ON 1=1 WHEN MATCHED THEN DELETE",
+        "WITH a AS (SELECT 1) UPDATE cat.sch.t SET x = 1",
+        "WITH a AS (SELECT 1) DELETE FROM t",
+        "SELECT 1; CREATE OR REPLACE TABLE t AS SELECT 1",
+        "SELECT 1; CREATE TEMPORARY VIEW v AS SELECT 1",
+        "SELECT 1; COPY INTO t FROM 's3://bucket/path'",
+        "SELECT 1; TRUNCATE TABLE t",
+    ],
+)
+def test_blocks_writes(client, query):
+    with pytest.raises(ValueError):
+        client._check_sql_safety(query)
@@ -0,0 +1,29 @@
+"""The sync session keeps the client's verify setting over CA bundle env vars."""
+
+import requests
+
+from utils import databricks_query
+from utils.databricks_query import DatabricksQueryClient
+
+
+def test_curl_ca_bundle_does_not_override_disabled_verify(
+    write_env, monkeypatch, tmp_path
+):
+    monkeypatch.delenv("REQUESTS_CA_BUNDLE", raising=False)
+    monkeypatch.setenv("CURL_CA_BUNDLE", str(tmp_path / "bundle.pem"))
+    client = DatabricksQueryClient(env_path=write_env())
+    seen = []
+
+    def send(adapter, request, **kwargs):
+        seen.append(kwargs["verify"])
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"{}"
+        return response
+
+    monkeypatch.setattr(databricks_query._TLSAdapter, "send", send)
+    monkeypatch.setattr(databricks_query, "_chunk_to_table", lambda *args: None)
+    client._api_request("GET", "/abc")
+    link = {"external_link": "https://storage.example.com/chunk"}
+    client._fetch_chunk("abc", 0, {"external_links": [link]}, [])
+    assert seen == [False, False]
@@ -1,15 +1,276 @@
 # ABOUTME: REST-based Databricks SQL query utility with safety checks
 # ABOUTME: Reusable library for secure SQL execution returning pandas DataFrames
 
+from __future__ import annotations
+
+import asyncio
+import base64
+import functools
+import hashlib
 import os
 import re
+import ssl
+import time
+import orjson
 import requests
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from dotenv import load_dotenv
-from typing import Optional, Union
+from requests import certs
+from requests.adapters import HTTPAdapter
+from typing import TYPE_CHECKING, Generator, Literal, Optional, Tuple, Union
+from urllib3.util.retry import Retry
+from urllib3.util.ssl_ import create_urllib3_context
 import warnings
-import json
+
+# pandas, pyarrow, httpx and dotenv are imported where they are used to keep the
+# module cheap to import (e.g. for safety checks or token setup)
+if TYPE_CHECKING:
+    import httpx
+    import pandas as pd
+    import pyarrow as pa
+
+# How execute_query uses the local result cache:
+# - enabled: serve hits from disk, execute and store misses
+# - replay: serve hits from disk, raise on misses (reproducible reruns)
+# - write_only: always execute, refresh the stored result
+# - disabled: never touch the cache
+CachePolicy = Literal["enabled", "replay", "disabled", "write_only"]
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_env(env_path_hint: Optional[str]) -> Path:
+    """Return the first existing .env file, trying common locations if no hint."""
+    if env_path_hint:
+        env_paths = [Path(env_path_hint)]
+    else:
+        # Try multiple common locations (add repo root first)
+        env_paths = [
+            Path.cwd() / ".env",  # Repository root when running scripts from project
+            Path.cwd().parent / ".env",  # One level up (e.g., when inside utils/)
+            Path.cwd().parent.parent
+            / ".env",  # Two levels up (e.g., from notebooks/temp_code)
+            Path.cwd().parent.parent.parent
+            / ".env",  # Original notebook context attempt
+            Path("..") / ".." / ".." / ".env",  # Relative path fallback
+            Path(
+                "/Users/kchauhan/repos/ngm_dataset_eda_v2/.env"
+            ),  # Absolute fallback (legacy)
+        ]
+
+    for path in env_paths:
+        if path.exists():
+            return path
+
+    raise EnvironmentError("Could not find .env file in any expected location")
+
+
+@functools.lru_cache(maxsize=1)
+def _load_creds(
+    env_path: Path, mtime_ns: int
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Load a .env file and return (token, hostname, http_path).
+
+    The file mtime is part of the cache key so a refreshed token is picked up.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv(env_path, override=True)
+    return (
+        os.getenv("DATABRICKS_ACCESS_TOKEN"),
+        os.getenv("DATABRICKS_SERVER_HOSTNAME"),
+        os.getenv("DATABRICKS_HTTP_PATH"),
+    )
+
+
+# Arrow type aliases for JSON_ARRAY results, which encode every value as a string
+_JSON_ARROW_TYPES = {
+    "BOOLEAN": "bool",
+    "BYTE": "int8",
+    "SHORT": "int16",
+    "INT": "int32",
+    "LONG": "int64",
+    "FLOAT": "float",
+    "DOUBLE": "double",
+    "DATE": "date32",
+}
+
+
+def _json_column_to_arrow(values: list, column: dict) -> pa.Array:
+    """Build a typed Arrow array from one column of a JSON_ARRAY result."""
+    import pyarrow as pa
+
+    array = pa.array(values, type=pa.string())
+
+    type_name = column.get("type_name")
+    if type_name == "DECIMAL":
+        arrow_type = pa.decimal128(
+            column.get("type_precision", 38), column.get("type_scale", 0)
+        )
+    elif type_name == "TIMESTAMP":
+        arrow_type = pa.timestamp("us", tz="UTC")
+    elif type_name in _JSON_ARROW_TYPES:
+        arrow_type = pa.type_for_alias(_JSON_ARROW_TYPES[type_name])
+    else:
+        arrow_type = None
+
+    if arrow_type is None:
+        return array
+    try:
+        return array.cast(arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # Keep values in an unexpected format as strings rather than fail
+        return array
+
+
+# Stable marker prepended to every statement sent by this client
+QUERY_TAG = "-- dbx_eda_client v1"
+
+
+# String literals and comments, kept verbatim (group 1), or a line break with
+# the whitespace around it. Comments are matched so quotes inside them are not
+# taken as literals; unterminated tokens run to the end of the query
+_LINE_BREAK_RE = re.compile(
+    r"""(--[^\n]*"""
+    r"""|/\*.*?(?:\*/|\Z)"""
+    r"""|'(?:[^'\\]|\\.)*(?:'|\Z)"""
+    r"""|"(?:[^"\\]|\\.)*(?:"|\Z)"""
+    r"""|`[^`]*(?:`|\Z))"""
+    r"""|[^\S\n]*\n\s*""",
+    re.DOTALL,
+)
+
+
+def _canonicalize(query: str) -> str:
+    """
+    Normalize query whitespace and prepend QUERY_TAG.
+
+    Indentation, trailing spaces and blank lines are dropped outside string
+    literals, so multi-line literals keep their exact contents. Line breaks
+    are kept so trailing -- comments cannot swallow the rest of the statement.
+    """
+    body = _LINE_BREAK_RE.sub(lambda m: m.group(1) or "\n", query.strip())
+    return f"{QUERY_TAG}\n{body}"
+
+
+_LEADING_KEYWORD_RE = re.compile(r"\s*([A-Za-z]+)")
+
+
+@functools.lru_cache(maxsize=256)
+def _classify(query: str) -> str:
+    """Return the upper-cased leading keyword of a query (e.g. SELECT)."""
+    # Only the first word is upper-cased, not the whole (possibly multi-KB) query
+    match = _LEADING_KEYWORD_RE.match(query)
+    return match.group(1).upper() if match else ""
+
+
+def _ssl_context(verify: Union[bool, str]) -> ssl.SSLContext:
+    """Build the SSL context shared by the sync and async HTTP clients."""
+    if verify is False:
+        context = create_urllib3_context(cert_reqs=ssl.CERT_NONE)
+    else:
+        context = create_urllib3_context()
+        context.load_verify_locations(
+            verify if isinstance(verify, str) else certs.where()
+        )
+    # urllib3 opts out of TLS session tickets by default
+    context.options &= ~ssl.OP_NO_TICKET
+    return context
+
+
+class _TLSAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools share one SSL context with session tickets enabled."""
+
+    def __init__(self, verify: Union[bool, str], **kwargs):
+        self._verify = verify
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["ssl_context"] = _ssl_context(self._verify)
+        super().init_poolmanager(*args, **kwargs)
+
+
+class DatabricksAPIError(RuntimeError):
+    """Raised when the Statement Execution API returns a non-200 response."""
+
+    def __init__(
+        self, message: str, status_code: int, error_code: Optional[str] = None
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.error_code = error_code
+
+
+def _api_error(status_code: int, content: bytes) -> DatabricksAPIError:
+    """Build a DatabricksAPIError from a non-200 response body."""
+    error_msg = f"API call failed with status {status_code}"
+    error_code = None
+    if content:
+        try:
+            error_detail = orjson.loads(content)
+            error_code = error_detail.get("error_code")
+            if "message" in error_detail:
+                error_msg += f": {error_detail['message']}"
+        except ValueError:
+            error_msg += f": {content.decode(errors='replace')}"
+
+    return DatabricksAPIError(error_msg, status_code, error_code)
+
+
+# A 400 on submission that names the result format or disposition, e.g.
+# "ARROW_STREAM format is not supported" or "INLINE disposition only supports
+# JSON_ARRAY". Other 400s (bad warehouse id, parameters, ...) are real errors
+_FORMAT_REJECTED_RE = re.compile(
+    r"\b(?:ARROW(?:_STREAM)?|EXTERNAL_LINKS|format|disposition)\b", re.IGNORECASE
+)
+
+
+def _rejects_result_format(error: DatabricksAPIError) -> bool:
+    """Whether a submission error is about the requested result format."""
+    if error.status_code != 400:
+        return False
+    return bool(
+        _FORMAT_REJECTED_RE.search(str(error))
+        or _FORMAT_REJECTED_RE.search(error.error_code or "")
+    )
+
+
+def _running_statement_id(response: dict, current: Optional[str]) -> Optional[str]:
+    """Track which statement is still running on the warehouse from an API response."""
+    if "statement_id" not in response or "status" not in response:
+        return current
+    state = response["status"].get("state")
+    return response["statement_id"] if state in ("PENDING", "RUNNING") else None
+
+
+def _chunk_to_table(chunk: dict, columns: list, downloads: list) -> pa.Table:
+    """
+    Convert one result chunk to an Arrow table.
+
+    Args:
+        chunk: Chunk response (inline attachment, data_array or external_links)
+        columns: Column descriptions (name, type_name) from the manifest
+        downloads: Arrow stream bodies downloaded from the chunk's external links
+
+    Returns:
+        pyarrow.Table: Chunk contents
+    """
+    import pyarrow as pa
+
+    if "attachment" in chunk:
+        return pa.ipc.open_stream(base64.b64decode(chunk["attachment"])).read_all()
+
+    if "data_array" in chunk or "external_links" not in chunk:
+        rows = chunk.get("data_array", [])
+        return pa.Table.from_arrays(
+            [
+                _json_column_to_arrow([row[i] for row in rows], column)
+                for i, column in enumerate(columns)
+            ],
+            names=[column["name"] for column in columns],
+        )
+
+    return pa.concat_tables([pa.ipc.open_stream(body).read_all() for body in downloads])
 
 
 class DatabricksQueryClient:
@@ -20,12 +281,67 @@ class DatabricksQueryClient:
     - SQL injection protection with dangerous pattern detection
     - Automatic environment variable loading
     - Built-in timeout and error handling
+    - Asynchronous execution with parallel Cloud Fetch result download
+    - asyncio batch API (execute_many) multiplexed over one HTTP/2 connection
+    - Optional on-disk result cache keyed on the query text
     - Returns pandas DataFrames for easy analysis
     - Detailed logging and debug options
     """
 
+    # Polling backoff for asynchronously submitted statements (seconds)
+    POLL_INITIAL_DELAY = 0.25
+    POLL_MAX_DELAY = 5.0
+
+    # Parallel downloads of external result chunks
+    MAX_DOWNLOAD_WORKERS = 8
+
+    # Per-request HTTP timeout (seconds)
+    REQUEST_TIMEOUT = 60
+
+    # Retries of throttled or failed API calls, shared by the sync and async
+    # clients (delay = RETRY_BACKOFF * 2 ** attempt)
+    RETRY_TOTAL = 5
+    RETRY_BACKOFF = 0.3
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    # Local cache of table schemas read from information_schema
+    SCHEMA_CACHE_DIR = Path.home() / ".cache" / "dbx_schema"
+
+    # Local cache of query results, one Parquet file per query
+    QUERY_CACHE_DIR = Path.home() / ".cache" / "dbx_query"
+
+    # Safe read-only SHOW commands
+    _SAFE_SHOW_RE = re.compile(
+        r"^\s*SHOW\s+(?:TABLES|DATABASES|SCHEMAS|COLUMNS|CREATE\s+TABLE|PARTITIONS|VIEWS)\b",
+        re.IGNORECASE,
+    )
+
+    # Statements that modify data or schema, fused into a single alternation.
+    # WITH is allowed as a leading keyword, so this must also cover every DML
+    # form that can follow a CTE (INSERT OVERWRITE, MERGE, ...)
+    _DANGEROUS_RE = re.compile(
+        r"\b(?:INSERT\s+(?:INTO|OVERWRITE)"
+        r"|UPDATE\s+[\w.`]+\s+SET"
+        r"|DELETE\s+FROM"
+        r"|MERGE\s+INTO"
+        r"|COPY\s+INTO"
+        r"|REPLACE\s+(?:TABLE|VIEW)"
+        r"|DROP\s+(?:TABLE|VIEW|DATABASE|SCHEMA)"
+        r"|CREATE\s+(?:OR\s+REPLACE\s+)?(?:TEMP(?:ORARY)?\s+)?"
+        r"(?:TABLE|VIEW|DATABASE|SCHEMA)"
+        r"|ALTER\s+(?:TABLE|VIEW|DATABASE|SCHEMA)"
+        r"|TRUNCATE\s+TABLE)\b",
+        re.IGNORECASE,
+    )
+
     def __init__(
-        self, env_path: Optional[Union[str, Path]] = None, debug: bool = False
+        self,
+        env_path: Optional[Union[str, Path]] = None,
+        debug: bool = False,
+        cache: CachePolicy = "disabled",
+        cache_ttl: Optional[float] = None,
+        disposition: Literal["EXTERNAL_LINKS", "INLINE"] = "EXTERNAL_LINKS",
+        ca_bundle: Optional[str] = None,
     ):
         """
         Initialize the Databricks query client.
@@ -33,56 +349,47 @@ class DatabricksQueryClient:
         Args:
             env_path: Path to .env file. If None, tries multiple common locations.
             debug: Enable debug logging for troubleshooting.
+            cache: Result cache policy (enabled, replay, write_only or disabled).
+            cache_ttl: Maximum age in seconds of a cached result, based on the
+                file mtime. None keeps cached results until they are deleted.
+            disposition: EXTERNAL_LINKS downloads Arrow chunks from cloud
+                storage (any size); INLINE returns them in the API response
+                (up to 25 MiB, one less hop for small results).
+            ca_bundle: CA bundle used to verify TLS certificates. Defaults to
+                REQUESTS_CA_BUNDLE; without either, verification is disabled
+                (CURL_CA_BUNDLE is not consulted).
         """
+        if cache not in ("enabled", "replay", "disabled", "write_only"):
+            raise ValueError(f"Unknown cache policy: {cache}")
+
         self.debug = debug
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.disposition = disposition
+        self.verify = ca_bundle or os.getenv("REQUESTS_CA_BUNDLE") or False
+        self._aclient = None
+        self._aclient_loop = None
         self._load_environment(env_path)
         self._validate_credentials()
+        self._init_session()
 
-        # Suppress SSL warnings for corporate environments
-        if not self.debug:
+        # Suppress SSL warnings for corporate environments without a CA bundle
+        if self.verify is False and not self.debug:
             warnings.filterwarnings("ignore", message="Unverified HTTPS request")
 
     def _load_environment(self, env_path: Optional[Union[str, Path]] = None):
         """Load environment variables from .env file with multiple fallback paths."""
-        if env_path:
-            env_paths = [Path(env_path)]
-        else:
-            # Try multiple common locations (add repo root first)
-            env_paths = [
-                Path.cwd()
-                / ".env",  # Repository root when running scripts from project
-                Path.cwd().parent / ".env",  # One level up (e.g., when inside utils/)
-                Path.cwd().parent.parent
-                / ".env",  # Two levels up (e.g., from notebooks/temp_code)
-                Path.cwd().parent.parent.parent
-                / ".env",  # Original notebook context attempt
-                Path("..") / ".." / ".." / ".env",  # Relative path fallback
-                Path(
-                    "/Users/kchauhan/repos/ngm_dataset_eda_v2/.env"
-                ),  # Absolute fallback (legacy)
-            ]
-
-        loaded = False
-        for path in env_paths:
-            if self.debug:
-                print(f"🔍 Trying env_path: {path.resolve()}")
-
-            if path.exists():
-                load_dotenv(path, override=True)
-                loaded = True
-                if self.debug:
-                    print(f"✅ Loaded environment from: {path.resolve()}")
-                break
-
-        if not loaded:
-            raise EnvironmentError("Could not find .env file in any expected location")
+        # Resolution and parsing are memoized at module scope, so only the
+        # first client in a process pays for the path probing and dotenv parse
+        self.env_path = _resolve_env(str(env_path) if env_path else None)
+        self.token, self.hostname, self.http_path = _load_creds(
+            self.env_path, self.env_path.stat().st_mtime_ns
+        )
+        if self.debug:
+            print(f"✅ Loaded environment from: {self.env_path.resolve()}")
 
     def _validate_credentials(self):
         """Validate that all required Databricks credentials are available."""
-        self.token = os.getenv("DATABRICKS_ACCESS_TOKEN")
-        self.hostname = os.getenv("DATABRICKS_SERVER_HOSTNAME")
-        self.http_path = os.getenv("DATABRICKS_HTTP_PATH")
-
         if self.debug:
             print(f"🔍 hostname: {self.hostname}")
             print(f"🔍 http_path: {self.http_path}")
@@ -115,6 +422,48 @@ class DatabricksQueryClient:
         if self.debug:
             print(f"🔍 warehouse_id: {self.warehouse_id}")
 
+        # Request pieces that never change between statements
+        self._url = f"https://{self.hostname}/api/2.0/sql/statements"
+        self._base_payload = {
+            "warehouse_id": self.warehouse_id,
+            "wait_timeout": "0s",
+            "disposition": self.disposition,
+            "format": "ARROW_STREAM",
+        }
+
+    @classmethod
+    def clear_cache(cls):
+        """Forget memoized .env locations, credentials and the shared client."""
+        _resolve_env.cache_clear()
+        _load_creds.cache_clear()
+        _client_for.cache_clear()
+
+    def _init_session(self):
+        """Create a pooled keep-alive HTTP session shared by all API calls."""
+        retries = Retry(
+            total=self.RETRY_TOTAL,
+            backoff_factor=self.RETRY_BACKOFF,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=["GET", "POST"],
+        )
+        adapter = _TLSAdapter(
+            self.verify, pool_connections=4, pool_maxsize=16, max_retries=retries
+        )
+
+        # Kept separately so the async client can send them to the API only,
+        # never to pre-signed download URLs
+        self._headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json",
+        }
+
+        # verify is also passed on every request: requests replaces a
+        # session-level setting with CURL_CA_BUNDLE/REQUESTS_CA_BUNDLE
+        self.session = requests.Session()
+        self.session.verify = self.verify
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self._headers)
+
     def _check_sql_safety(self, query: str) -> None:
         """
         Check SQL query for dangerous patterns that could modify data.
@@ -125,201 +474,731 @@ class DatabricksQueryClient:
         Raises:
             ValueError: If dangerous patterns are detected
         """
-        query_upper = query.upper().strip()
+        keyword = _classify(query)
 
-        # Only allow SELECT and safe SHOW statements
-        if not (query_upper.startswith('SELECT') or query_upper.startswith('SHOW')):
-            raise ValueError('Only SELECT and SHOW queries are allowed')
+        # Only allow SELECT, WITH, DESCRIBE and safe SHOW statements
+        if keyword not in ("SELECT", "WITH", "SHOW", "DESCRIBE"):
+            raise ValueError("Only SELECT, WITH, SHOW and DESCRIBE queries are allowed")
 
         # If it's a SHOW statement, ensure it's a safe read-only SHOW command
-        if query_upper.startswith("SHOW"):
-            safe_show_patterns = [
-                r"^SHOW\s+TABLES",
-                r"^SHOW\s+DATABASES",
-                r"^SHOW\s+SCHEMAS",
-                r"^SHOW\s+COLUMNS",
-                r"^SHOW\s+CREATE\s+TABLE",
-                r"^SHOW\s+PARTITIONS",
-                r"^SHOW\s+VIEWS",
-            ]
-
-            is_safe_show = any(
-                re.match(pattern, query_upper) for pattern in safe_show_patterns
+        if keyword == "SHOW" and not self._SAFE_SHOW_RE.match(query):
+            raise ValueError(
+                "Only safe read-only SHOW commands are allowed (TABLES, DATABASES, SCHEMAS, COLUMNS, etc.)"
             )
-            if not is_safe_show:
-                raise ValueError(
-                    "Only safe read-only SHOW commands are allowed (TABLES, DATABASES, SCHEMAS, COLUMNS, etc.)"
-                )
 
         # Block dangerous statement patterns
-        dangerous_patterns = [
-            r"\bINSERT\s+INTO\b",
-            r"\bUPDATE\s+\w+\s+SET\b",
-            r"\bDELETE\s+FROM\b",
-            r"\bDROP\s+(TABLE|VIEW|DATABASE|SCHEMA)\b",
-            r"\bCREATE\s+(TABLE|VIEW|DATABASE|SCHEMA)\b",
-            r"\bALTER\s+(TABLE|VIEW|DATABASE|SCHEMA)\b",
-            r"\bTRUNCATE\s+TABLE\b",
-        ]
+        match = self._DANGEROUS_RE.search(query)
+        if match:
+            raise ValueError(f"Dangerous SQL pattern detected: {match.group().upper()}")
+
+    def _api_request(
+        self, method: str, path: str = "", payload: Optional[dict] = None
+    ) -> dict:
+        """
+        Call the Statement Execution API and return the decoded JSON body.
+
+        Args:
+            method: HTTP method (GET or POST)
+            path: Path relative to /api/2.0/sql/statements
+            payload: Optional JSON body
+
+        Returns:
+            dict: Decoded JSON response
+
+        Raises:
+            DatabricksAPIError: If the API returns a non-200 response
+            RuntimeError: If the request fails at the network level
+        """
+        try:
+            response = self.session.request(
+                method,
+                self._url + path,
+                json=payload,
+                verify=self.verify,
+                timeout=self.REQUEST_TIMEOUT,
+            )
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError(f"Network error: {e}")
+
+        if response.status_code != 200:
+            raise _api_error(response.status_code, response.content)
+
+        return orjson.loads(response.content)
+
+    def _statement_steps(
+        self, query: str, query_name: str, timeout: int
+    ) -> Generator[Union[tuple, float], Optional[dict], dict]:
+        """
+        Submit a statement and poll it with exponential backoff until it finishes.
+
+        Written once for both the sync and async paths: the generator yields
+        (method, path, payload) API calls, which the driver answers with the
+        decoded response (or by throwing the DatabricksAPIError back in), and
+        float delays to sleep for. See _run_statement and _run_statement_async.
+
+        Args:
+            query: Canonicalized SQL query
+            query_name: Descriptive name for logging purposes
+            timeout: Maximum seconds to wait before cancelling the statement
+
+        Returns:
+            dict: Final statement response (state SUCCEEDED)
+
+        Raises:
+            DatabricksAPIError: If the submission is rejected
+            RuntimeError: If the statement fails, is cancelled or times out
+        """
+        payload = {**self._base_payload, "statement": query}
+
+        if self.debug:
+            print(f"🔄 Executing: {query_name}")
+            print(f"🔍 Timeout: {timeout}s")
+
+        try:
+            statement = yield ("POST", "", payload)
+        except DatabricksAPIError as e:
+            # Workspaces without Arrow result support reject the format;
+            # fall back to inline JSON rows
+            if not _rejects_result_format(e):
+                raise
+            if self.debug:
+                print(f"⚠️ Arrow results rejected, retrying as JSON: {e}")
+            payload.update(format="JSON_ARRAY", disposition="INLINE")
+            statement = yield ("POST", "", payload)
+
+        statement_id = statement.get("statement_id")
+        if self.debug:
+            print(f"🔍 Statement ID: {statement_id}")
+
+        deadline = time.monotonic() + timeout
+        delay = self.POLL_INITIAL_DELAY
+
+        while statement.get("status", {}).get("state") in ("PENDING", "RUNNING"):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                yield ("POST", f"/{statement_id}/cancel", None)
+                raise RuntimeError(
+                    f"Query timed out after {timeout}s (statement {statement_id})"
+                )
+
+            yield min(delay, remaining)
+            delay = min(delay * 2, self.POLL_MAX_DELAY)
+            statement = yield ("GET", f"/{statement_id}", None)
+
+            if self.debug:
+                print(f"🔍 {query_name} status: {statement['status']['state']}")
+
+        return self._check_final_state(statement)
+
+    def _run_statement(self, query: str, query_name: str, timeout: int) -> dict:
+        """
+        Drive _statement_steps with blocking I/O.
+
+        A statement still running when the caller is interrupted (Ctrl-C) is
+        cancelled on the warehouse.
+        """
+        steps = self._statement_steps(query, query_name, timeout)
+        response, error, running_id = None, None, None
+        try:
+            while True:
+                try:
+                    step = steps.throw(error) if error else steps.send(response)
+                except StopIteration as done:
+                    return done.value
+
+                response, error = None, None
+                if not isinstance(step, tuple):
+                    time.sleep(step)
+                    continue
+                try:
+                    response = self._api_request(*step)
+                except DatabricksAPIError as e:
+                    error = e
+                    continue
+                running_id = _running_statement_id(response, running_id)
+        except KeyboardInterrupt:
+            if running_id:
+                try:
+                    self._api_request("POST", f"/{running_id}/cancel")
+                except RuntimeError:
+                    pass  # Best effort; the interrupt still propagates
+            raise
+
+    @staticmethod
+    def _check_final_state(statement: dict) -> dict:
+        """
+        Return a finished statement, raising if it did not succeed.
+
+        Raises:
+            RuntimeError: If the statement failed or was cancelled
+        """
+        status = statement.get("status", {})
+        state = status.get("state", "unknown")
+
+        if state == "FAILED":
+            error_info = status.get("error", {})
+            error_msg = error_info.get("message", "Unknown error")
+            error_code = error_info.get("error_code", "UNKNOWN")
+            raise RuntimeError(f"Query failed: {error_msg} (Code: {error_code})")
+        if state != "SUCCEEDED":
+            raise RuntimeError(f"Query did not succeed (state: {state})")
+
+        return statement
+
+    def _fetch_chunk(
+        self,
+        statement_id: str,
+        chunk_index: int,
+        chunk: Optional[dict],
+        columns: list,
+    ) -> pa.Table:
+        """
+        Fetch one result chunk and convert it to an Arrow table.
+
+        Handles Arrow chunks behind pre-signed Cloud Fetch URLs, inline base64
+        Arrow attachments, and the JSON data_array fallback.
+
+        Args:
+            statement_id: Statement the chunk belongs to
+            chunk_index: Index of the chunk in the result manifest
+            chunk: Result data already returned for this chunk, if any
+            columns: Column descriptions (name, type_name) from the manifest
+
+        Returns:
+            pyarrow.Table: Chunk contents
+        """
+        if chunk is None:
+            chunk = self._api_request(
+                "GET", f"/{statement_id}/result/chunks/{chunk_index}"
+            )
+
+        downloads = []
+        for link in chunk.get("external_links", []):
+            # Pre-signed URLs carry their own credentials - never send the token.
+            # Links may require extra headers (e.g. an encryption key); they are
+            # sent as given and never logged
+            try:
+                response = self.session.get(
+                    link["external_link"],
+                    headers={"Authorization": None, **link.get("http_headers", {})},
+                    verify=self.verify,
+                    timeout=self.REQUEST_TIMEOUT,
+                )
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                raise RuntimeError(
+                    f"Failed to download result chunk {chunk_index}: {e}"
+                )
+
+            downloads.append(response.content)
+
+        return _chunk_to_table(chunk, columns, downloads)
+
+    def _result_layout(self, statement: dict) -> Tuple[list, dict, list]:
+        """
+        Describe the chunks of a finished statement.
 
-        for pattern in dangerous_patterns:
-            if re.search(pattern, query_upper):
-                match = re.search(pattern, query_upper).group()
-                raise ValueError(f"Dangerous SQL pattern detected: {match}")
+        Args:
+            statement: Statement response with state SUCCEEDED
+
+        Returns:
+            tuple: (schema columns, chunks already returned by index, all
+                chunk indexes in order)
+        """
+        manifest = statement.get("manifest", {})
+        schema_columns = manifest.get("schema", {}).get("columns", [])
+
+        # The first chunk (inline data or its external links) comes back with
+        # the statement itself; the rest are fetched by index
+        known_chunks = {}
+        first_chunk = statement.get("result")
+        if first_chunk:
+            known_chunks[first_chunk.get("chunk_index", 0)] = first_chunk
+
+        chunk_indexes = [chunk["chunk_index"] for chunk in manifest.get("chunks", [])]
+        if not chunk_indexes:
+            chunk_indexes = sorted(known_chunks)
+
+        if self.debug:
+            columns = [col["name"] for col in schema_columns]
+            print(f"🔍 Found {len(columns)} columns: {columns}")
+            print(f"🔍 Fetching {len(chunk_indexes)} {manifest.get('format')} chunk(s)")
+
+        return schema_columns, known_chunks, chunk_indexes
+
+    def _fetch_result(self, statement: dict) -> pd.DataFrame:
+        """
+        Fetch all result chunks of a finished statement in parallel.
+
+        Args:
+            statement: Statement response with state SUCCEEDED
+
+        Returns:
+            pandas.DataFrame: Query results backed by Arrow dtypes
+        """
+        import pandas as pd
+        import pyarrow as pa
+
+        statement_id = statement["statement_id"]
+        schema_columns, known_chunks, chunk_indexes = self._result_layout(statement)
+
+        if not chunk_indexes:
+            return pd.DataFrame(columns=[col["name"] for col in schema_columns])
+
+        workers = min(self.MAX_DOWNLOAD_WORKERS, len(chunk_indexes))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            tables = list(
+                pool.map(
+                    lambda index: self._fetch_chunk(
+                        statement_id, index, known_chunks.get(index), schema_columns
+                    ),
+                    chunk_indexes,
+                )
+            )
+
+        return pa.concat_tables(tables).to_pandas(types_mapper=pd.ArrowDtype)
+
+    def _cache_path(self, query: str) -> Path:
+        """Return the cache file for a query, keyed on workspace and SQL text."""
+        key = hashlib.sha256(f"{self.hostname}\n{query}".encode()).hexdigest()
+        return self.QUERY_CACHE_DIR / f"{key}.parquet"
+
+    def _read_cached_result(
+        self, path: Path, query_name: str
+    ) -> Optional[pd.DataFrame]:
+        """
+        Read a cached result file according to the cache policy and TTL.
+
+        Args:
+            path: Cache file (see _cache_path and get_table_columns)
+            query_name: Descriptive name for logging purposes
+
+        Returns:
+            pandas.DataFrame or None: Cached result, or None on a miss
+
+        Raises:
+            RuntimeError: On a cache miss in replay mode
+        """
+        import pandas as pd
+
+        if self.cache in ("disabled", "write_only"):
+            return None
+
+        if path.exists() and (
+            self.cache_ttl is None
+            or time.time() - path.stat().st_mtime <= self.cache_ttl
+        ):
+            if self.debug:
+                print(f"💾 Cache hit for {query_name}: {path}")
+            return pd.read_parquet(path, dtype_backend="pyarrow")
+
+        if self.cache == "replay":
+            raise RuntimeError(f"No cached result for {query_name} (replay mode)")
+        return None
+
+    def _write_cached_result(self, path: Path, df: pd.DataFrame):
+        """Store a result in a cache file according to the cache policy (best effort)."""
+        if self.cache not in ("enabled", "write_only"):
+            return
+
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{id(df)}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file first so concurrent readers never see a
+            # partially written result
+            df.to_parquet(tmp_path, compression="zstd", index=False)
+            os.replace(tmp_path, path)
+        except (OSError, ValueError) as e:
+            if self.debug:
+                print(f"⚠️ Could not cache result: {e}")
+            tmp_path.unlink(missing_ok=True)
 
     def execute_query(
-        self, query: str, query_name: str = "Query", timeout: int = 30
+        self, query: str, query_name: str = "Query", timeout: int = 300
     ) -> pd.DataFrame:
         """
         Execute a read-only SQL query on Databricks and return results as pandas DataFrame.
 
+        The statement is submitted asynchronously and polled until it finishes.
+        Results are requested as Arrow streams, either via external links
+        (Cloud Fetch, chunks downloaded in parallel straight from cloud
+        storage) or inline, and fall back to JSON rows if Arrow is rejected.
+
+        Queries are canonicalized (indentation and blank lines outside string
+        literals dropped, a stable tag comment prepended) so reruns hit the warehouse result cache. Queries
+        using non-deterministic functions such as current_timestamp() are never
+        served from that cache.
+
         Args:
             query: SQL SELECT query to execute
             query_name: Descriptive name for logging purposes
-            timeout: Query timeout in seconds (5-50 seconds API limit)
+            timeout: Maximum seconds to wait for the query to finish
 
         Returns:
             pandas.DataFrame: Query results
 
         Raises:
             ValueError: If query fails safety checks
-            RuntimeError: If API call fails
+            RuntimeError: If API call fails, the query times out, or the
+                result is missing from the cache in replay mode
+        """
+        query, cached = self._prepare_query(query, query_name)
+        if cached is not None:
+            return cached
+
+        statement = self._run_statement(query, query_name, timeout)
+        return self._finish_query(query, self._fetch_result(statement))
+
+    def _prepare_query(
+        self, query: str, query_name: str
+    ) -> Tuple[str, Optional[pd.DataFrame]]:
+        """
+        Check and canonicalize a query, and look it up in the result cache.
+
+        Returns:
+            tuple: (canonical query, cached result or None)
         """
         # Safety checks
         self._check_sql_safety(query)
 
-        # Ensure timeout is within API limits (5-50 seconds)
-        api_timeout = min(max(timeout, 5), 50)
-
-        # Prepare API request
-        url = f"https://{self.hostname}/api/2.0/sql/statements"
-        headers = {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json",
-        }
+        # Byte-identical text lets the warehouse result cache (and ours) hit
+        # even when the same query is indented differently or has blank lines
+        query = _canonicalize(query)
 
-        payload = {
-            "statement": query,
-            "warehouse_id": self.warehouse_id,
-            "wait_timeout": f"{api_timeout}s",
-        }
+        return query, self._read_cached_result(self._cache_path(query), query_name)
 
+    def _finish_query(self, query: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Log and cache a freshly fetched result."""
         if self.debug:
-            print(f"🔄 Executing: {query_name}")
-            print(f"🔍 Timeout: {api_timeout}s")
+            print(f"✅ Success: {len(df)} rows returned")
+
+        self._write_cached_result(self._cache_path(query), df)
+        return df
+
+    def _async_client(self) -> httpx.AsyncClient:
+        """Create an HTTP/2 client for the asyncio API (headers sent per request)."""
+        import httpx
+
+        return httpx.AsyncClient(
+            http2=True,
+            verify=_ssl_context(self.verify),
+            timeout=self.REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=self.MAX_DOWNLOAD_WORKERS * 2),
+        )
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Return the client's shared async HTTP client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        # httpx connections belong to the loop that opened them, and each
+        # asyncio.run() starts a new loop
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._aclient = self._async_client()
+            self._aclient_loop = loop
+        return self._aclient
+
+    async def aclose(self):
+        """Close the async HTTP client, if one was opened on this event loop."""
+        if self._aclient is not None:
+            if self._aclient_loop is asyncio.get_running_loop():
+                await self._aclient.aclose()
+            self._aclient = self._aclient_loop = None
+
+    async def _api_request_async(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        path: str = "",
+        payload: Optional[dict] = None,
+    ) -> dict:
+        """
+        Async counterpart of _api_request on a shared httpx client.
+
+        Raises:
+            DatabricksAPIError: If the API returns a non-200 response
+            RuntimeError: If the request fails at the network level
+        """
+        import httpx
 
+        # Same retry policy as the sync session's urllib3 Retry
+        for attempt in range(self.RETRY_TOTAL + 1):
+            delay = self.RETRY_BACKOFF * 2**attempt
+            try:
+                response = await client.request(
+                    method,
+                    self._url + path,
+                    content=orjson.dumps(payload) if payload is not None else None,
+                    headers=self._headers,
+                )
+            except httpx.TransportError as e:
+                if attempt == self.RETRY_TOTAL:
+                    raise RuntimeError(f"Network error: {e}")
+            except httpx.HTTPError as e:
+                raise RuntimeError(f"Network error: {e}")
+            else:
+                if (
+                    response.status_code not in self.RETRY_STATUSES
+                    or attempt == self.RETRY_TOTAL
+                ):
+                    break
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = int(retry_after)
+            await asyncio.sleep(delay)
+
+        if response.status_code != 200:
+            raise _api_error(response.status_code, response.content)
+
+        return orjson.loads(response.content)
+
+    async def _run_statement_async(
+        self, client: httpx.AsyncClient, query: str, query_name: str, timeout: int
+    ) -> dict:
+        """
+        Drive _statement_steps on the event loop; sleeping yields to other queries.
+
+        A statement still running when the task is cancelled is cancelled on
+        the warehouse as well.
+        """
+        steps = self._statement_steps(query, query_name, timeout)
+        response, error, running_id = None, None, None
         try:
-            response = requests.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=api_timeout + 10,
-                verify=False,
+            while True:
+                try:
+                    step = steps.throw(error) if error else steps.send(response)
+                except StopIteration as done:
+                    return done.value
+
+                response, error = None, None
+                if not isinstance(step, tuple):
+                    await asyncio.sleep(step)
+                    continue
+                try:
+                    response = await self._api_request_async(client, *step)
+                except DatabricksAPIError as e:
+                    error = e
+                    continue
+                running_id = _running_statement_id(response, running_id)
+        except asyncio.CancelledError:
+            if running_id:
+                try:
+                    await self._api_request_async(
+                        client, "POST", f"/{running_id}/cancel"
+                    )
+                except RuntimeError:
+                    pass  # Best effort; the cancellation still propagates
+            raise
+
+    async def _fetch_chunk_async(
+        self,
+        client: httpx.AsyncClient,
+        statement_id: str,
+        chunk_index: int,
+        chunk: Optional[dict],
+        columns: list,
+    ) -> pa.Table:
+        """Async counterpart of _fetch_chunk; external links download concurrently."""
+        import httpx
+
+        if chunk is None:
+            chunk = await self._api_request_async(
+                client, "GET", f"/{statement_id}/result/chunks/{chunk_index}"
             )
 
-            if response.status_code == 200:
-                result = response.json()
-
-                if self.debug:
-                    print(f"🔍 API response keys: {list(result.keys())}")
-
-                if "result" in result:
-                    # Extract column information - try multiple locations
-                    columns = []
-
-                    # Try result.manifest.schema.columns first
-                    if (
-                        "manifest" in result["result"]
-                        and "schema" in result["result"]["manifest"]
-                    ):
-                        columns = [
-                            col["name"]
-                            for col in result["result"]["manifest"]["schema"]["columns"]
-                        ]
-
-                    # Try top-level manifest.schema.columns as backup
-                    elif "manifest" in result and "schema" in result["manifest"]:
-                        columns = [
-                            col["name"]
-                            for col in result["manifest"]["schema"]["columns"]
-                        ]
-
-                    if self.debug and not columns:
-                        print(f"🔍 Could not find columns in response structure")
-                        if "manifest" in result:
-                            print(
-                                f"🔍 Top-level manifest keys: {list(result['manifest'].keys())}"
-                            )
-                        if "result" in result and "manifest" in result["result"]:
-                            print(
-                                f"🔍 Result manifest keys: {list(result['result']['manifest'].keys())}"
-                            )
-
-                    if self.debug and columns:
-                        print(f"🔍 Found {len(columns)} columns: {columns}")
-
-                    # Extract data
-                    data = result["result"].get("data_array", [])
-
-                    if data and columns:
-                        df = pd.DataFrame(data, columns=columns)
-                        if self.debug:
-                            print(f"✅ Success: {len(df)} rows returned")
-                        return df
-                    elif data and not columns:
-                        # Fallback: return data without column names
-                        df = pd.DataFrame(data)
-                        if self.debug:
-                            print(f"⚠️ Got {len(data)} rows but no column info")
-                        return df
-                    else:
-                        if self.debug:
-                            print(
-                                f"⚠️ No data returned (data: {len(data) if data else 0}, columns: {len(columns) if columns else 0})"
-                            )
-                        return pd.DataFrame()
-                else:
-                    # Handle query execution states
-                    status = result.get("status", {})
-                    state = status.get("state", "unknown")
-
-                    if state == "FAILED" and "error" in status:
-                        error_info = status["error"]
-                        error_msg = error_info.get("message", "Unknown error")
-                        error_code = error_info.get("error_code", "UNKNOWN")
-                        raise RuntimeError(
-                            f"Query failed: {error_msg} (Code: {error_code})"
-                        )
-                    else:
-                        if self.debug:
-                            print(f"⚠️ Query status: {state}")
-                        return pd.DataFrame()
+        async def download(link: dict) -> bytes:
+            # Pre-signed URLs carry their own credentials - never send the token,
+            # only the headers the link requires
+            try:
+                response = await client.get(
+                    link["external_link"], headers=link.get("http_headers")
+                )
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                raise RuntimeError(
+                    f"Failed to download result chunk {chunk_index}: {e}"
+                )
+            return response.content
 
-            else:
-                error_msg = f"API call failed with status {response.status_code}"
-                if response.text:
-                    try:
-                        error_detail = response.json()
-                        if "message" in error_detail:
-                            error_msg += f": {error_detail['message']}"
-                    except:
-                        error_msg += f": {response.text}"
+        downloads = await asyncio.gather(
+            *(download(link) for link in chunk.get("external_links", []))
+        )
+        return _chunk_to_table(chunk, columns, downloads)
 
-                raise RuntimeError(error_msg)
+    async def _fetch_result_async(
+        self, client: httpx.AsyncClient, statement: dict
+    ) -> pd.DataFrame:
+        """Async counterpart of _fetch_result."""
+        import pandas as pd
+        import pyarrow as pa
 
-        except requests.exceptions.RequestException as e:
-            raise RuntimeError(f"Network error: {e}")
+        statement_id = statement["statement_id"]
+        schema_columns, known_chunks, chunk_indexes = self._result_layout(statement)
+
+        if not chunk_indexes:
+            return pd.DataFrame(columns=[col["name"] for col in schema_columns])
+
+        tables = await asyncio.gather(
+            *(
+                self._fetch_chunk_async(
+                    client, statement_id, index, known_chunks.get(index), schema_columns
+                )
+                for index in chunk_indexes
+            )
+        )
+        return pa.concat_tables(tables).to_pandas(types_mapper=pd.ArrowDtype)
+
+    async def _execute_on(
+        self, client: httpx.AsyncClient, query: str, query_name: str, timeout: int
+    ) -> pd.DataFrame:
+        """Run execute_query's pipeline on an async client."""
+        query, cached = self._prepare_query(query, query_name)
+        if cached is not None:
+            return cached
+
+        statement = await self._run_statement_async(client, query, query_name, timeout)
+        return self._finish_query(
+            query, await self._fetch_result_async(client, statement)
+        )
+
+    async def execute_query_async(
+        self, query: str, query_name: str = "Query", timeout: int = 300
+    ) -> pd.DataFrame:
+        """
+        Asyncio version of execute_query.
+
+        Same safety checks, caching and result handling as execute_query, but
+        polling and downloads await instead of blocking. Use execute_many to
+        run several queries over one shared connection.
+
+        Args:
+            query: SQL SELECT query to execute
+            query_name: Descriptive name for logging purposes
+            timeout: Maximum seconds to wait for the query to finish
+
+        Returns:
+            pandas.DataFrame: Query results
+
+        Raises:
+            ValueError: If query fails safety checks
+            RuntimeError: If API call fails, the query times out, or the
+                result is missing from the cache in replay mode
+        """
+        return await self._execute_on(
+            self._get_async_client(), query, query_name, timeout
+        )
+
+    async def execute_many(
+        self,
+        queries: dict,
+        timeout: int = 300,
+        return_exceptions: bool = False,
+    ) -> dict:
+        """
+        Execute a batch of independent queries concurrently.
+
+        All statements are submitted up front and polled on one event loop,
+        multiplexed over a single HTTP/2 connection to the workspace, so the
+        batch takes about as long as its slowest query. When a query fails
+        and return_exceptions is False, the other queries are cancelled,
+        including their statements on the warehouse.
+
+        Args:
+            queries: Mapping of query name to SQL text
+            timeout: Maximum seconds to wait for each query to finish
+            return_exceptions: Return a query's exception in place of its
+                DataFrame instead of raising the first failure
+
+        Returns:
+            dict: Query name to DataFrame (or exception), in input order
+
+        Raises:
+            ValueError: If a query fails safety checks (unless return_exceptions)
+            RuntimeError: If a query fails (unless return_exceptions)
+        """
+        client = self._get_async_client()
+        tasks = [
+            asyncio.ensure_future(self._execute_on(client, sql, name, timeout))
+            for name, sql in queries.items()
+        ]
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        except BaseException:
+            # Don't leave sibling statements running on the warehouse
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return dict(zip(queries, results))
+
+    def get_table_columns(
+        self, table_name: str, use_cache: bool = True
+    ) -> pd.DataFrame:
+        """
+        Get the columns of a table from information_schema without scanning data.
+
+        Results are cached as Parquet under SCHEMA_CACHE_DIR so later runs skip
+        the metadata round-trip entirely. The schema cache follows the client's
+        cache policy and cache_ttl, like query results.
+
+        Args:
+            table_name: Fully qualified table name (catalog.schema.table)
+            use_cache: Use the local schema cache (subject to the cache policy)
+
+        Returns:
+            pandas.DataFrame: column_name and data_type in ordinal order
+
+        Raises:
+            ValueError: If table_name is not a valid three-part name
+            RuntimeError: If API call fails, or the schema is missing from
+                the cache in replay mode
+        """
+        parts = [part.strip("`") for part in table_name.split(".")]
+        if len(parts) != 3 or not all(re.fullmatch(r"[\w-]+", p) for p in parts):
+            raise ValueError(
+                f"Expected a fully qualified catalog.schema.table name: {table_name}"
+            )
+        catalog, schema, table = parts
+
+        query_name = f"Schema for {table_name}"
+        cache_path = self.SCHEMA_CACHE_DIR / f"{catalog}.{schema}.{table}.parquet"
+        if use_cache:
+            cached = self._read_cached_result(cache_path, query_name)
+            if cached is not None:
+                return cached
+
+        sql = f"""
+            SELECT column_name, data_type
+            FROM system.information_schema.columns
+            WHERE table_catalog = '{catalog}'
+              AND table_schema = '{schema}'
+              AND table_name = '{table}'
+            ORDER BY ordinal_position
+            """
+        # Bypass the query result cache: the schema cache above is the only
+        # cache for lookups, so use_cache=False and the empty-result rule hold
+        self._check_sql_safety(sql)
+        statement = self._run_statement(_canonicalize(sql), query_name, 300)
+        columns = self._fetch_result(statement)
+
+        # An empty result usually means a missing or inaccessible table;
+        # don't pin that on disk
+        if use_cache and not columns.empty:
+            self._write_cached_result(cache_path, columns)
+
+        return columns
 
     def test_connection(self) -> bool:
         """
         Test the connection to Databricks with a simple query.
 
+        The probe is deterministic so repeated tests can be answered from the
+        warehouse result cache.
+
         Returns:
             bool: True if connection successful, False otherwise
         """
         try:
             result = self.execute_query(
-                "SELECT 1 as test, current_timestamp() as timestamp",
+                "SELECT 1 as test",
                 "Connection Test",
                 timeout=10,
             )
@@ -331,8 +1210,24 @@ class DatabricksQueryClient:
 
 
 # Convenience functions for quick usage
+@functools.lru_cache(maxsize=2)
+def _client_for(debug: bool, env_mtime_ns: int) -> DatabricksQueryClient:
+    """Build the shared client for one version of the .env file."""
+    return DatabricksQueryClient(debug=debug)
+
+
+def _get_client(debug: bool = False) -> DatabricksQueryClient:
+    """
+    Return a shared client so repeated convenience calls reuse one session.
+
+    The .env mtime is part of the cache key, so after token_auth_setup.py
+    refreshes the token the next call builds a client with the new one.
+    """
+    return _client_for(debug, _resolve_env(None).stat().st_mtime_ns)
+
+
 def query_databricks(
-    query: str, query_name: str = "Query", timeout: int = 30, debug: bool = False
+    query: str, query_name: str = "Query", timeout: int = 300, debug: bool = False
 ) -> pd.DataFrame:
     """
     Convenience function to execute a single query without managing client instance.
@@ -346,8 +1241,7 @@ def query_databricks(
     Returns:
         pandas.DataFrame: Query results
     """
-    client = DatabricksQueryClient(debug=debug)
-    return client.execute_query(query, query_name, timeout)
+    return _get_client(debug).execute_query(query, query_name, timeout)
 
 
 def test_databricks_connection(debug: bool = False) -> bool:
@@ -360,5 +1254,4 @@ def test_databricks_connection(debug: bool = False) -> bool:
     Returns:
         bool: True if connection successful
     """
-    client = DatabricksQueryClient(debug=debug)
-    return client.test_connection()
+    return _get_client(debug).test_connection()
@@ -1,12 +1,7 @@
 # ABOUTME: Example usage of the Databricks query utility
 # ABOUTME: Demonstrates various ways to use the utility library
 
-import sys
-from pathlib import Path
-
-# Add utils to path for importing
-sys.path.append(str(Path(__file__).parent))
-
+# Running this file puts utils/ on sys.path, so no path setup is needed
 from databricks_query import DatabricksQueryClient, query_databricks
 
 def main():
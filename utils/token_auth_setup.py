@@ -12,22 +12,161 @@ Usage:
     python token_auth_setup.py [--refresh-token] [--test-connection]
 """
 
+import functools
+import importlib.util
 import os
 import json
+import re
+import select
+import shutil
 import subprocess
 import sys
+import tempfile
+import traceback
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Iterator, Optional, Dict, Tuple
 import argparse
-import configparser
+
+# Minimal INI grammar for ~/.databrickscfg: section headers and key = value lines
+_SECTION_RE = re.compile(r'^\[([^\]]+)\]\s*$')
+# Like ConfigParser: either '=' or ':' separates a key from its value
+_KV_RE = re.compile(r'^\s*([A-Za-z_][\w.-]*)\s*[=:]\s*(.*?)\s*$')
+
+
+def _iter_cfg(path: str) -> Iterator[Tuple[str, str, str]]:
+    """
+    Yield (section, key, value) for each setting of a .databrickscfg file, in file order.
+    
+    Keys are lower-cased, as ConfigParser does, so 'Host = ...' and
+    'token: ...' are read the same as 'host=' and 'token='.
+    """
+    section = None
+    with open(path, 'r') as f:
+        for line in f:
+            match = _SECTION_RE.match(line)
+            if match:
+                section = match.group(1)
+                continue
+            match = _KV_RE.match(line)
+            if match and section is not None:
+                yield section, match.group(1).lower(), match.group(2)
+
+
+@functools.lru_cache(maxsize=8)
+def _find_cfg_token(path: str, mtime_ns: int, size: int, host: str) -> Optional[Tuple[str, str]]:
+    """
+    Return (section, token) of the first profile whose host matches.
+    
+    Hosts are compared without trailing slashes, so host must already be
+    normalized. The file is streamed and reading stops as soon as the
+    matching profile has both its host and token. mtime and size are part of
+    the cache key so an edited file is scanned again.
+    """
+    current_section, current = None, {}
+    for section, key, value in _iter_cfg(path):
+        if section != current_section:
+            current_section, current = section, {}
+        # Normalize each host once when read, not on every comparison
+        current[key] = value.rstrip('/') if key == 'host' else value
+        if current.get('token') and current.get('host') == host:
+            return section, current['token']
+    return None
+
+
+@functools.lru_cache(maxsize=8)
+def _load_env(path: str, mtime_ns: int, size: int) -> Tuple[Tuple[Optional[str], Optional[str], str], ...]:
+    """
+    Parse a .env file into (key, value, raw_line) tuples in file order.
+    
+    Comments and blank lines are kept as (None, None, raw_line) so the file
+    can be written back unchanged apart from the updated keys. mtime and size
+    are part of the cache key so an edited file is re-parsed.
+    """
+    lines = []
+    with open(path, 'r') as f:
+        for raw_line in f:
+            if not raw_line.endswith('\n'):
+                raw_line += '\n'
+            line = raw_line.strip()
+            if line and not line.startswith('#') and '=' in line:
+                key, value = line.split('=', 1)
+                lines.append((key, value, raw_line))
+            else:
+                lines.append((None, None, raw_line))
+    return tuple(lines)
+
+
+def _wait_for_exit(proc: subprocess.Popen, timeout: float) -> int:
+    """
+    Wait for a child process to exit and return its exit code.
+    
+    Sleeps on a pidfd (Linux 5.3+) or a kqueue process filter (macOS/BSD) so
+    the wait wakes the moment the child exits; other platforms fall back to
+    Popen.wait.
+    
+    Raises:
+        subprocess.TimeoutExpired: If the child is still running after timeout
+    """
+    if hasattr(os, 'pidfd_open'):
+        try:
+            pidfd = os.pidfd_open(proc.pid)
+        except OSError:
+            pidfd = None  # Kernel without pidfd support
+        if pidfd is not None:
+            try:
+                poller = select.poll()
+                poller.register(pidfd, select.POLLIN)
+                if not poller.poll(timeout * 1000):
+                    raise subprocess.TimeoutExpired(proc.args, timeout)
+            finally:
+                os.close(pidfd)
+            return proc.wait()
+    elif hasattr(select, 'kqueue'):
+        kq = select.kqueue()
+        try:
+            event = select.kevent(
+                proc.pid,
+                filter=select.KQ_FILTER_PROC,
+                flags=select.KQ_EV_ADD | select.KQ_EV_ONESHOT,
+                fflags=select.KQ_NOTE_EXIT,
+            )
+            if not kq.control([event], 1, timeout):
+                raise subprocess.TimeoutExpired(proc.args, timeout)
+        except ProcessLookupError:
+            pass  # Already exited
+        finally:
+            kq.close()
+        return proc.wait()
+    
+    return proc.wait(timeout=timeout)
+
+
+def _stop_process(proc: subprocess.Popen) -> None:
+    """Terminate a child process, killing it if it does not exit promptly."""
+    if proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
 
 
 class DatabricksTokenSetup:
     """Simplified Databricks setup using CLI-generated tokens."""
     
-    def __init__(self, workspace_root: Optional[Path] = None):
-        """Initialize with workspace root directory."""
+    def __init__(self, workspace_root: Optional[Path] = None, debug: Optional[bool] = None):
+        """
+        Initialize with workspace root directory.
+        
+        Diagnostic output is enabled with debug=True, or by setting
+        DBX_SETUP_DEBUG=1 when debug is not given.
+        """
         self.workspace_root = workspace_root or Path.cwd()
+        if debug is None:
+            debug = os.environ.get('DBX_SETUP_DEBUG', '0') not in ('', '0')
+        self.debug = debug
         self.env_file = self.workspace_root / '.env'
         self.venv_python = self.workspace_root / '.venv' / 'bin' / 'python'
         self.venv_databricks = self.workspace_root / '.venv' / 'bin' / 'databricks'
@@ -36,17 +175,24 @@ class DatabricksTokenSetup:
         self.host = "https://mcafee-mosaic-databricks-etl01-dev.cloud.databricks.com"
         self.hostname = "mcafee-mosaic-databricks-etl01-dev.cloud.databricks.com"
         self.http_path = "/sql/1.0/warehouses/0468b6bc765c667c"
+        
+        # Invariants used when looking up the CLI profile
+        self._host_normalized = self.host.rstrip('/')
+        self._home = Path.home()
+        self._databricks_cfg = self._home / '.databrickscfg'
     
     def check_databricks_cli(self) -> bool:
         """Check if Databricks CLI is available in the virtual environment."""
         print(f"🔍 Checking Databricks CLI availability...")
-        print(f"   📁 Workspace root: {self.workspace_root}")
-        print(f"   🐍 Expected venv python: {self.venv_python}")
-        print(f"   🛠️  Expected venv databricks: {self.venv_databricks}")
-        print(f"   ✅ Venv python exists: {self.venv_python.exists()}")
-        print(f"   ✅ Venv databricks exists: {self.venv_databricks.exists()}")
+        venv_databricks_exists = self.venv_databricks.exists()
+        if self.debug:
+            print(f"   📁 Workspace root: {self.workspace_root}")
+            print(f"   🐍 Expected venv python: {self.venv_python}")
+            print(f"   🛠️  Expected venv databricks: {self.venv_databricks}")
+            print(f"   ✅ Venv python exists: {self.venv_python.exists()}")
+            print(f"   ✅ Venv databricks exists: {venv_databricks_exists}")
         
-        if not self.venv_databricks.exists():
+        if not venv_databricks_exists:
             print("❌ Databricks CLI not found in virtual environment")
             print(f"   Expected location: {self.venv_databricks}")
             print("   Install with: pip install databricks-cli")
@@ -57,9 +203,10 @@ class DatabricksTokenSetup:
     def generate_oauth_token(self) -> bool:
         """Generate OAuth token using Databricks CLI."""
         print("🔑 Generating OAuth token using Databricks CLI...")
-        print(f"   🔧 Virtual env databricks CLI: {self.venv_databricks}")
-        print(f"   🔧 Virtual env exists: {self.venv_databricks.exists()}")
-        print(f"   🔧 Host: {self.host}")
+        if self.debug:
+            print(f"   🔧 Virtual env databricks CLI: {self.venv_databricks}")
+            print(f"   🔧 Virtual env exists: {self.venv_databricks.exists()}")
+            print(f"   🔧 Host: {self.host}")
         
         try:
             # Run databricks configure with OAuth
@@ -70,33 +217,40 @@ class DatabricksTokenSetup:
                 "--host", self.host
             ]
             
-            print(f"   🚀 Running: {' '.join(cmd)}")
+            if self.debug:
+                print(f"   🚀 Running: {' '.join(cmd)}")
             print("   📝 This will open a browser window for OAuth authentication")
             print("   ⏳ Waiting for OAuth completion...")
             
-            result = subprocess.run(
-                cmd,
-                capture_output=False,  # Let user interact with browser
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
+            # Inherit stdio so the user can interact with the browser flow
+            proc = subprocess.Popen(cmd)
+            try:
+                returncode = _wait_for_exit(proc, timeout=300)  # 5 minute timeout
+            except BaseException:
+                # Timeout or Ctrl-C: don't leave the CLI running behind us
+                _stop_process(proc)
+                raise
             
-            print(f"   📊 OAuth process completed with return code: {result.returncode}")
+            if self.debug:
+                print(f"   📊 OAuth process completed with return code: {returncode}")
             
-            if result.returncode == 0:
+            if returncode == 0:
                 print("✅ OAuth configuration completed successfully")
                 return True
             else:
-                print(f"❌ OAuth configuration failed with return code: {result.returncode}")
+                print(f"❌ OAuth configuration failed with return code: {returncode}")
                 return False
                 
         except subprocess.TimeoutExpired:
             print("❌ OAuth configuration timed out (5 minutes)")
             return False
+        except KeyboardInterrupt:
+            print("\n❌ OAuth configuration cancelled")
+            return False
         except Exception as e:
             print(f"❌ Error during OAuth configuration: {e}")
-            import traceback
-            print(f"   🔍 Traceback: {traceback.format_exc()}")
+            if self.debug:
+                print(f"   🔍 Traceback: {traceback.format_exc()}")
             return False
     
     def extract_token_from_config(self) -> Optional[str]:
@@ -104,52 +258,47 @@ class DatabricksTokenSetup:
         print("🔍 Extracting token from Databricks configuration...")
         
         # Check home directory and config file location
-        databricks_cfg_path = Path.home() / '.databrickscfg'
-        print(f"   📁 Home directory: {Path.home()}")
-        print(f"   📄 Config file path: {databricks_cfg_path}")
-        print(f"   📄 Config file exists: {databricks_cfg_path.exists()}")
+        databricks_cfg_path = self._databricks_cfg
+        databricks_cfg_exists = databricks_cfg_path.exists()
+        if self.debug:
+            print(f"   📁 Home directory: {self._home}")
+            print(f"   📄 Config file path: {databricks_cfg_path}")
+            print(f"   📄 Config file exists: {databricks_cfg_exists}")
       
         # Fallback: try to read from config file
         try:
-            if databricks_cfg_path.exists():
-                print(f"   📖 Reading config file: {databricks_cfg_path}")
-                config = configparser.ConfigParser()
-                config.read(databricks_cfg_path)
+            if databricks_cfg_exists:
+                if self.debug:
+                    print(f"   📖 Reading config file: {databricks_cfg_path}")
                 
-                print(f"   📋 Found sections: {list(config.sections())}")
+                if self.debug:
+                    print(f"   🔍 Normalized target host: '{self._host_normalized}'")
                 
-                # Look for the profile matching our host
-                for section_name in config.sections():
-                    section = config[section_name]
-                    section_host = section.get('host')
-                    print(f"   🔍 Section '{section_name}': host='{section_host}'")
-                    
-                    # Normalize hosts by removing trailing slashes for comparison
-                    normalized_section_host = section_host.rstrip('/') if section_host else None
-                    normalized_target_host = self.host.rstrip('/')
-                    
-                    print(f"   🔍 Normalized section host: '{normalized_section_host}'")
-                    print(f"   🔍 Normalized target host: '{normalized_target_host}'")
-                    
-                    if normalized_section_host == normalized_target_host:
-                        token = section.get('token')
-                        print(f"   🎯 Found matching section: {section_name}")
-                        print(f"   🔑 Token present: {bool(token)}")
-                        if token:
-                            print(f"   🔑 Token length: {len(token)} characters")
-                            print(f"   🔑 Token preview: {token[:20]}...")
-                            return token
-                        else:
-                            print(f"   ❌ No token found in matching section")
-                            
+                stat = databricks_cfg_path.stat()
+                match = _find_cfg_token(
+                    str(databricks_cfg_path), stat.st_mtime_ns, stat.st_size, self._host_normalized
+                )
+                if match:
+                    section_name, token = match
+                    print(f"   🎯 Found matching section: {section_name}")
+                    if self.debug:
+                        print(f"   🔑 Token length: {len(token)} characters")
+                        print(f"   🔑 Token preview: {token[:20]}...")
+                    return token
+                
+                # Only scan the whole file to explain a miss
+                if self.debug:
+                    for section_name, key, value in _iter_cfg(str(databricks_cfg_path)):
+                        if key == 'host':
+                            print(f"   🔍 Section '{section_name}': host='{value}'")
                 print("   ⚠️  No matching host found in any section")
             else:
                 print("   ❌ Config file does not exist")
                             
         except Exception as e:
             print(f"⚠️  Could not read from .databrickscfg: {e}")
-            import traceback
-            print(f"   🔍 Traceback: {traceback.format_exc()}")
+            if self.debug:
+                print(f"   🔍 Traceback: {traceback.format_exc()}")
         
         print("❌ Could not extract access token")
         return None
@@ -157,24 +306,23 @@ class DatabricksTokenSetup:
     def update_env_file(self, access_token: str) -> bool:
         """Update .env file with the new access token."""
         print("📝 Updating .env file with new token...")
-        print(f"   📄 Target file: {self.env_file}")
-        print(f"   🔑 Token length: {len(access_token)} characters")
+        if self.debug:
+            print(f"   📄 Target file: {self.env_file}")
+            print(f"   🔑 Token length: {len(access_token)} characters")
         
         try:
-            # Read existing .env content
-            env_content = {}
+            # Read existing .env content, keeping comments and line order
+            lines = []
             if self.env_file.exists():
-                print("   📖 Reading existing .env file...")
-                with open(self.env_file, 'r') as f:
-                    for line_num, line in enumerate(f, 1):
-                        line = line.strip()
-                        if line and not line.startswith('#') and '=' in line:
-                            key, value = line.split('=', 1)
-                            env_content[key] = value
-                            print(f"     Line {line_num}: {key}=<value>")
-                print(f"   📋 Found {len(env_content)} existing environment variables")
+                if self.debug:
+                    print("   📖 Reading existing .env file...")
+                stat = self.env_file.stat()
+                lines = list(_load_env(str(self.env_file), stat.st_mtime_ns, stat.st_size))
             else:
                 print("   📄 Creating new .env file...")
+            index = {key: i for i, (key, _, _) in enumerate(lines) if key is not None}
+            if self.debug:
+                print(f"   📋 Found {len(index)} existing environment variables")
             
             # Update with new values
             new_values = {
@@ -185,39 +333,75 @@ class DatabricksTokenSetup:
                 'DATABRICKS_AUTH_TYPE': 'token'  # Changed from oauth-u2m to token
             }
             
-            print("   🔄 Updating with new values:")
+            if self.debug:
+                print("   🔄 Updating with new values:")
+            changed = 0
             for key, value in new_values.items():
-                if key == 'DATABRICKS_ACCESS_TOKEN':
-                    print(f"     {key}=<token_{len(value)}_chars>")
+                if self.debug:
+                    if key == 'DATABRICKS_ACCESS_TOKEN':
+                        print(f"     {key}=<token_{len(value)}_chars>")
+                    else:
+                        print(f"     {key}={value}")
+                
+                entry = (key, value, f"{key}={value}\n")
+                if key not in index:
+                    index[key] = len(lines)
+                    lines.append(entry)
+                elif lines[index[key]][1] != value:
+                    lines[index[key]] = entry
                 else:
-                    print(f"     {key}={value}")
+                    continue
+                changed += 1
             
-            env_content.update(new_values)
+            if not changed:
+                print(f"✅ {self.env_file} already up to date")
+                return True
             
-            # Write back to .env file
-            print(f"   💾 Writing {len(env_content)} variables to .env file...")
-            with open(self.env_file, 'w') as f:
-                for key, value in env_content.items():
-                    f.write(f"{key}={value}\n")
+            # Write to a temp file in the same directory and swap it in, so
+            # the .env is never left half-written
+            if self.debug:
+                print(f"   💾 Writing {changed} changed variable(s) to .env file...")
+            # Swap in at the symlink's target so a linked .env stays a link
+            target = self.env_file.resolve()
+            f = tempfile.NamedTemporaryFile(
+                'w', dir=target.parent, prefix='.env.', delete=False
+            )
+            try:
+                with f:
+                    f.write(''.join(raw_line for _, _, raw_line in lines))
+                # The temp file is created 0600; keep the existing file's
+                # mode (a new .env stays 0600 since it holds the token)
+                if target.exists():
+                    shutil.copymode(target, f.name)
+                os.replace(f.name, target)
+            except BaseException:
+                os.unlink(f.name)
+                raise
             
             print(f"✅ Updated {self.env_file}")
             return True
             
         except Exception as e:
             print(f"❌ Error updating .env file: {e}")
-            import traceback
-            print(f"   🔍 Traceback: {traceback.format_exc()}")
+            if self.debug:
+                print(f"   🔍 Traceback: {traceback.format_exc()}")
             return False
     
     def test_connection(self) -> bool:
         """Test the connection using the simple query client."""
         print("🧪 Testing connection with new token...")
         
+        # Fail fast with a clear message instead of an ImportError traceback
+        if importlib.util.find_spec('databricks_query') is None:
+            print("❌ Connection test failed: databricks_query module not found")
+            print("   Run this script from the repository (python3 utils/token_auth_setup.py)")
+            return False
+        
         try:
-            # Import and test the simple query client
+            # Imported here so setup without --test-connection never loads pandas
             from databricks_query import DatabricksQueryClient
             
-            client = DatabricksQueryClient(env_path=self.env_file, debug=True)
+            client = DatabricksQueryClient(env_path=self.env_file, debug=self.debug)
             
             # Simple test query
             test_query = "SELECT 1 as test_value"
@@ -238,11 +422,13 @@ class DatabricksTokenSetup:
     def setup_token_auth(self, refresh_token: bool = False) -> bool:
         """Complete token authentication setup process."""
         print("🚀 Setting up Databricks token-based authentication")
-        print(f"   📁 Workspace: {self.workspace_root}")
-        print(f"   🌐 Host: {self.host}")
-        print(f"   📄 Env file: {self.env_file}")
-        print(f"   📄 Env file exists: {self.env_file.exists()}")
-        print(f"   🔄 Refresh token requested: {refresh_token}")
+        env_file_exists = self.env_file.exists()
+        if self.debug:
+            print(f"   📁 Workspace: {self.workspace_root}")
+            print(f"   🌐 Host: {self.host}")
+            print(f"   📄 Env file: {self.env_file}")
+            print(f"   📄 Env file exists: {env_file_exists}")
+            print(f"   🔄 Refresh token requested: {refresh_token}")
         print()
         
         # Check prerequisites
@@ -251,7 +437,7 @@ class DatabricksTokenSetup:
             return False
         
         # Generate token if needed
-        should_generate = refresh_token or not self.env_file.exists()
+        should_generate = refresh_token or not env_file_exists
         print(f"2️⃣  Token generation needed: {should_generate}")
         
         if should_generate:
@@ -290,10 +476,14 @@ def main():
                        help='Test connection after setup')
     parser.add_argument('--workspace', type=Path,
                        help='Workspace root directory (default: current directory)')
+    parser.add_argument('--debug', action='store_true',
+                       help='Print diagnostic details (same as DBX_SETUP_DEBUG=1)')
     
     args = parser.parse_args()
+    if args.workspace is not None and not args.workspace.is_dir():
+        parser.error(f"workspace directory does not exist: {args.workspace}")
     
-    setup = DatabricksTokenSetup(workspace_root=args.workspace)
+    setup = DatabricksTokenSetup(workspace_root=args.workspace, debug=args.debug or None)
     
     success = setup.setup_token_auth(refresh_token=args.refresh_token)
     